@@ -1,33 +1,164 @@
-import json
+import hashlib
+import os
+import pickle
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from src.utils import load_config
+from typing import Iterable, Iterator
+from src.utils import load_config, json_loads, json_dumps, advise_sequential, release_page_cache
 from src.logger import logging
 from src.exception import CustomException
 
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
 
-def list_json_files(directory: Path) -> list:
+# The merged file is written in many small pieces, buffer them into 1 MiB writes
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _iter_json_files(root, dir_mtimes: list = None):
+    """
+    Recursively yields the paths of JSON, JSONL and Parquet files under a directory.
+
+    Uses os.scandir so the file type comes from the directory listing itself,
+    without a stat() call or Path object per entry.
+
+    Args:
+        root (Path): Directory to walk.
+        dir_mtimes (list, optional): Receives a (path, mtime_ns) pair for every
+                                     directory walked, taken before it is listed.
+
+    Yields:
+        str: Path of each JSON, JSONL or Parquet file found.
+    """
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        if dir_mtimes is not None:
+            dir_mtimes.append((path, os.stat(path).st_mtime_ns))
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(('.json', '.jsonl', '.parquet')):
+                    yield entry.path
+
+
+def _file_index_key(directory: Path) -> str:
+    """
+    Builds the cache key for a directory's file listing.
+
+    Args:
+        directory (Path): Path to the directory with JSON files.
+
+    Returns:
+        str: Hex digest identifying the directory.
+    """
+    return hashlib.sha1(str(directory.resolve()).encode('utf-8')).hexdigest()
+
+
+def _directories_unchanged(dir_mtimes: list) -> bool:
+    """
+    Checks that none of the directories of a cached listing changed since it
+    was taken. Adding or removing a file or folder changes the mtime of the
+    directory holding it, so every walked directory is checked, at any depth.
+
+    Args:
+        dir_mtimes (list): (path, mtime_ns) pairs recorded by _iter_json_files.
+
+    Returns:
+        bool: True if every directory still exists with the recorded mtime.
+    """
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes)
+    except OSError:
+        return False
+
+
+def _write_file_index(cache_file: Path, dir_mtimes: list, json_files: list):
+    """
+    Atomically writes a file listing to the cache.
+
+    Args:
+        cache_file (Path): Path of the cache file to write.
+        dir_mtimes (list): (path, mtime_ns) pairs of the walked directories.
+        json_files (list): List of JSON file paths.
+    """
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump((dir_mtimes, json_files), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+
+def _cache_file_index(cache_file: Path, json_files, dir_mtimes: list):
+    """
+    Passes file paths through and caches the full listing once it is exhausted.
+
+    Args:
+        cache_file (Path): Path of the cache file to write.
+        json_files (Iterator): Iterator of JSON file paths.
+        dir_mtimes (list): Filled by the walk behind json_files, complete once it is exhausted.
+
+    Yields:
+        str: Path of each JSON file.
+    """
+    listed = []
+    for file_path in json_files:
+        listed.append(file_path)
+        yield file_path
+    _write_file_index(cache_file, dir_mtimes, listed)
+
+
+def list_json_files(directory: Path, cache_dir: Path = None) -> Iterator:
     """
     Lists the JSON files in a given directory.
 
+    The listing is produced lazily so that merging can start on the first files
+    while the rest of the directory is still being scanned.
+
     Args:
         directory (Path): Path to the directory with JSON files.
+        cache_dir (Path, optional): Directory to cache the listing in. When given, the listing
+                                    is reused until any directory in the tree changes.
 
     Raises:
         CustomException: if the directory does not exist or no JSON files are found.
 
     Returns:
-        list: List of JSON file paths.
+        Iterator: Iterator of JSON file paths.
     """
     try:
         if not directory.exists():
             raise CustomException(f"Directory does not exist: {directory}")
+
+        cache_file = None
+        dir_mtimes = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir) / f"file_index_{_file_index_key(directory)}.pkl"
+            if cache_file.exists():
+                with open(cache_file, 'rb') as f:
+                    cached_mtimes, cached_files = pickle.load(f)
+                if _directories_unchanged(cached_mtimes):
+                    logging.info(f"Loaded file listing from cache: {cache_file}")
+                    return iter(cached_files)
+                logging.info(f"File listing cache is stale, rescanning: {directory}")
+            dir_mtimes = []
         
-        json_files = list(directory.rglob("*.json"))
+        json_files = _iter_json_files(directory, dir_mtimes)
+        first_file = next(json_files, None)
         
-        if not json_files:
+        if first_file is None:
             logging.warning(f"No JSON files found in directory: {directory}")
             raise CustomException("No JSON files found.")
+
+        json_files = chain([first_file], json_files)
+        if cache_file is not None:
+            json_files = _cache_file_index(cache_file, json_files, dir_mtimes)
         
         return json_files
         
@@ -37,41 +168,119 @@ def list_json_files(directory: Path) -> list:
         raise CustomException(error_message)
 
 
-def merge_json(file_paths: list, output_path: Path):
+def _read_json_records(file_path):
+    """
+    Reads a single JSON file and returns its records as a raw JSON fragment.
+
+    The document is parsed once to validate it, but the original bytes are
+    returned so the records don't have to be re-encoded. A top-level array is
+    returned without its surrounding brackets, any other document as is. A
+    JSONL file is returned as its lines joined by commas, and the rows of a
+    Parquet file are encoded as JSON records.
+
+    Args:
+        file_path (Path): Path to the JSON, JSONL or Parquet file.
+
+    Returns:
+        bytes: The comma-separated records, or None if the file could not be
+               read or holds no records.
+    """
+    try:
+        if str(file_path).endswith('.parquet'):
+            if pq is None:
+                raise CustomException("pyarrow is required to read Parquet files")
+            records = pq.read_table(file_path).to_pylist()
+            return json_dumps(records, indent=False)[1:-1] or None
+
+        with open(file_path, 'rb') as file:
+            advise_sequential(file)
+            raw = file.read().strip()
+
+        if str(file_path).endswith('.jsonl'):
+            lines = [line.strip() for line in raw.splitlines() if line.strip()]
+            for line in lines:
+                json_loads(line)
+            return b','.join(lines) or None
+
+        # Parse only to validate, the shape is known from the first byte
+        json_loads(raw)
+
+        if raw[:1] == b'[':
+            return raw[1:-1].strip() or None
+        return raw
+
+    except Exception as e:
+        logging.error("Error merging content from %s: %s", file_path, e)
+        return None
+
+
+def _read_ahead(executor, file_paths: Iterable, window: int) -> Iterator:
+    """
+    Reads files on the executor and yields their records in input order,
+    keeping at most `window` reads in flight or waiting to be consumed, so a
+    slow file can't make the records of every later file pile up in memory.
+
+    Args:
+        executor (ThreadPoolExecutor): Pool to read the files on.
+        file_paths (Iterable): JSON file paths, may be a lazy iterator.
+        window (int): Maximum number of files read ahead of the consumer.
+
+    Yields:
+        bytes: The records of each file as returned by _read_json_records.
+    """
+    pending = deque()
+    for file_path in file_paths:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(_read_json_records, file_path))
+    while pending:
+        yield pending.popleft().result()
+
+
+def merge_json(file_paths: Iterable, output_path: Path):
     """
     Merges the individual JSON files.
 
+    Files are read and validated concurrently on a thread pool, at most two
+    per worker ahead of the writer, and their records are streamed into the
+    output array in input order without building the merged list in memory.
+    The array is written to a temporary file that replaces output_path only
+    once it is complete, so a failed merge leaves the previous output intact.
+
     Args:
-        file_paths (list): List of JSON file paths.
+        file_paths (Iterable): JSON file paths, may be a lazy iterator.
         output_path (Path): Path for the merged output file.
 
     Raises:
         CustomException: If there's an error during merging or saving.
     """
     logging.info(f'Started merging to {output_path}')
-    merged_data = []
-
-    for file_path in file_paths:
-        try:
-            with open(file_path, 'r', encoding="utf-8") as file:
-                data = json.load(file)
-                # Append data based on whether it’s a list or dictionary
-                if isinstance(data, list):
-                    merged_data.extend(data)
-                else:
-                    merged_data.append(data)
-                
-        except Exception as e:
-            error_message = f"Error merging content from {file_path}: {str(e)}"
-            logging.error(error_message)
-            continue    
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
 
     try:
-        with open(output_path, 'w', encoding="utf-8") as output_file:
-            json.dump(merged_data, output_file, ensure_ascii=False, indent=4)
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as output_file:
+            advise_sequential(output_file)
+            output_file.write(b'[')
+            is_first = True
+
+            for records in _read_ahead(executor, file_paths, 2 * max_workers):
+                if records is None:
+                    continue
+                if not is_first:
+                    output_file.write(b',')
+                output_file.write(records)
+                is_first = False
+
+            output_file.write(b']')
+            release_page_cache(output_file)
+        os.replace(tmp_path, output_path)
         logging.info(f"Successfully merged data to: {output_path}")
 
     except Exception as e:
+        tmp_path.unlink(missing_ok=True)
         error_message = f"Error writing merged data to {output_path}: {str(e)}"
         logging.error(error_message)
         raise CustomException(error_message)
@@ -82,8 +291,9 @@ if __name__ == "__main__":
         config = load_config('config.yaml')
         output_path = Path(config['MERGED_DATA_PATH'])  # Specify output data path
         directory = Path(config['SCRAPED_DATA_PATH'])   # Specify raw data path
+        cache_dir = Path(config['FILE_INDEX_CACHE_PATH'])
 
-        json_files = list_json_files(directory)
+        json_files = list_json_files(directory, cache_dir)
         merge_json(json_files, output_path)
 
     except CustomException as ce:
@@ -1,57 +1,109 @@
+import mmap
 import pandas as pd
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from src.utils import load_config
+from src.utils import load_config, json_loads, json_dumps, advise_sequential, release_page_cache
 from src.logger import logging
 from src.exception import CustomException
-from sklearn.model_selection import train_test_split
+
+try:
+    from pyarrow import json as pa_json
+except ImportError:
+    pa_json = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 def load_json(file_path):
-    """Load a JSON file into a pandas DataFrame."""
+    """Load a JSON or NDJSON (.jsonl, .jsonl.zst) file into a pandas DataFrame."""
+    if str(file_path).endswith(('.jsonl', '.jsonl.zst')) and pa_json is not None:
+        try:
+            read_options = pa_json.ReadOptions(use_threads=True, block_size=8 << 20)
+            return pa_json.read_json(file_path, read_options=read_options).to_pandas()
+        except Exception as e:
+            error_message = f"Error loading data from {file_path}: {str(e)}"
+            logging.error(error_message)
+            raise CustomException(error_message)
+
+    return pd.DataFrame(load_json_raw(file_path))
+
+def load_json_raw(file_path) -> list:
+    """Load a JSON or NDJSON (.jsonl, .jsonl.zst) file as a list of records, without building a DataFrame."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
-        return df
+        with open(file_path, 'rb') as f:
+            advise_sequential(f)
+            if str(file_path).endswith('.jsonl.zst'):
+                if zstandard is None:
+                    raise CustomException("zstandard is required to read compressed sets")
+                content = zstandard.ZstdDecompressor().decompress(f.read())
+                return [json_loads(line) for line in content.splitlines() if line.strip()]
+            if str(file_path).endswith('.jsonl'):
+                return [json_loads(line) for line in f if line.strip()]
+
+            # Parse straight from the page cache; mmap fails on empty files and some platforms
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                return json_loads(f.read())
+            with mapped, memoryview(mapped) as view:
+                return json_loads(view)
     except Exception as e:
         error_message = f"Error loading data from {file_path}: {str(e)}"
         logging.error(error_message)
         raise CustomException(error_message)
 
-def split_and_save_smaller_sets(df, base_path, set_type, set_size=500):
+def _write_set(set_info):
+    """Write one (filename, records) pair to disk as an NDJSON file, zstd-compressed for .zst names."""
+    set_filename, smaller_set = set_info
+    content = b''.join(json_dumps(record, indent=False) + b'\n' for record in smaller_set)
+    if set_filename.suffix == '.zst':
+        content = zstandard.ZstdCompressor(level=3, threads=-1).compress(content)
+
+    with open(set_filename, 'wb') as f:
+        advise_sequential(f)
+        f.write(content)
+        release_page_cache(f)
+
+def split_and_save_smaller_sets(data, base_path, set_type, set_size=500, compress=False):
     """
-    Split the DataFrame into smaller sets of the given size and save them as separate JSON files.
+    Split the records into smaller sets of the given size and save them as separate NDJSON files.
 
     Args:
-        df (DataFrame): The dataframe to be split.
+        data (list): The records to be split.
         base_path (str): The base path to save the datasets.
         set_type (str): The type of dataset (train, dev, or test).
         set_size (int): The number of rows for each set (default is 500).
+        compress (bool): Compress each set with zstd into .jsonl.zst files (default is False).
 
     Raises:
         CustomException: Raise error if splitting or saving fails.
     """
     try:
+        if compress and zstandard is None:
+            raise CustomException("zstandard is required to compress sets")
+
         # Ensure the path exists
         set_path = Path(base_path) / set_type
+        suffix = '.jsonl.zst' if compress else '.jsonl'
         set_path.mkdir(parents=True, exist_ok=True)
 
-        # Calculate the number of splits needed
-        num_splits = len(df) // set_size
+        # Calculate the number of splits needed, rounding up for a partial last set
+        num_splits = -(-len(data) // set_size)
 
-        # Split and save each subset
-        for i in range(num_splits + 1):
-            start_index = i * set_size
-            end_index = start_index + set_size
+        # Pair each subset with its filename
+        sets = [
+            (set_path / f"{set_type}_set_{i+1}{suffix}", data[i * set_size:(i + 1) * set_size])
+            for i in range(num_splits)
+        ]
 
-            # Slice the DataFrame for the current set
-            smaller_set = df[start_index:end_index]
+        # Save the subsets concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(_write_set, sets))
 
-            # Construct the filename and save
-            set_filename = set_path / f"{set_type}_set_{i+1}.json"
-            with open(set_filename, 'w', encoding='utf-8') as f:
-                json.dump(smaller_set.to_dict(orient='records'), f, indent=7, ensure_ascii=False)
-            logging.info(f"Created dataset: {set_filename}")
+        if sets:
+            logging.info("Created %d %s datasets: first=%s last=%s", len(sets), set_type, sets[0][0], sets[-1][0])
 
         print(f"Data successfully split into smaller sets of {set_size} rows each for {set_type}!")
 
@@ -65,11 +117,11 @@ if __name__ == "__main__":
     config = load_config('config.yaml')
 
     # Load data from JSON paths specified in config.yaml
-    train_df = load_json(config['TRAIN_DATA_PATH'])
-    dev_df = load_json(config['DEV_DATA_PATH'])
-    test_df = load_json(config['TEST_DATA_PATH'])
+    train_data = load_json_raw(config['TRAIN_DATA_PATH'])
+    dev_data = load_json_raw(config['DEV_DATA_PATH'])
+    test_data = load_json_raw(config['TEST_DATA_PATH'])
 
     # Use SPLIT_PATH for the output directory, creating subfolders for train, dev, and test
-    split_and_save_smaller_sets(train_df, config['SPLIT_PATH'], 'train', set_size=500)
-    split_and_save_smaller_sets(dev_df, config['SPLIT_PATH'], 'dev', set_size=500)
-    split_and_save_smaller_sets(test_df, config['SPLIT_PATH'], 'test', set_size=500)
+    split_and_save_smaller_sets(train_data, config['SPLIT_PATH'], 'train', set_size=500)
+    split_and_save_smaller_sets(dev_data, config['SPLIT_PATH'], 'dev', set_size=500)
+    split_and_save_smaller_sets(test_data, config['SPLIT_PATH'], 'test', set_size=500)
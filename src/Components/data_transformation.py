@@ -1,19 +1,89 @@
 import pandas as pd
 import numpy as np
-import json
 import sys
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from sklearn.model_selection import train_test_split
-from src.utils import get_unique_id, load_config, data_loader
+from src.utils import get_unique_id, load_config, data_loader, json_dumps
 from src.logger import logging
 from src.exception import CustomException
 
 config = load_config('config.yaml')
 OUTPUT_PATH = Path(config['TRANSFORMED_DATA_PATH'])
 MERGED_DATA_PATH = Path(config['MERGED_DATA_PATH']) 
+
+# Every character str.isspace() accepts. The regex engine behind pyarrow strings
+# only treats ASCII whitespace as \s, so patterns spell out the rest.
+WHITESPACE_CLASS = '\\s\x0b\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+
+# Patterns used by the passage filters, compiled once at import
+SPECIAL_CHAR_RE = re.compile(r'[^\w\s]', re.UNICODE)  # Special characters excluding word characters and spaces
+ENGLISH_LETTERS_RE = re.compile(r'[A-Za-z]')  # Matches English letters
+MATH_SEQUENCE_RE = re.compile(r'\d\s*[\+\-\*/^=]\s*\d')  # Sequences resembling mathematical equations
+SPECIAL_CHARS_CLASS = r'[\[\]{}"\'/\\]'  # Any of the special characters [ ] { } " ' / \
+
+# English letters | special characters [ ] { } " ' / \ | mathematical-like sequences.
+# Kept as a string so pyarrow-backed columns run it in their own regex engine, where
+# \d is ASCII only, so \p{Nd} stands in for it to also catch Sinhala and other digits
+UNWANTED_PASSAGE_PATTERN = rf'[A-Za-z]|{SPECIAL_CHARS_CLASS}|\p{{Nd}}[{WHITESPACE_CLASS}]*[\+\-\*/^=][{WHITESPACE_CLASS}]*\p{{Nd}}'
+# The same filter for Python's re, used on columns that aren't pyarrow-backed
+UNWANTED_PASSAGE_PATTERN_PY = rf'[A-Za-z]|{SPECIAL_CHARS_CLASS}|{MATH_SEQUENCE_RE.pattern}'
     
+def convert_to_categorical(df, columns=('site', 'category')):
+    """
+    Converts low-cardinality string columns to the category dtype, so equality
+    and isin filters compare integer codes instead of Python strings
+
+    Args:
+        df (dataframe): Input dataframe with data to be changed
+        columns (tuple): Columns to convert (default is ('site', 'category'))
+
+    Raises:
+        CustomException: Raise KeyError if a column does not exist
+
+    Returns:
+        df: The transformed DataFrame after applying the  operations
+    """
+    try:
+        for column in columns:
+            df[column] = df[column].astype('category')
+        logging.info(f'Converted columns to category dtype: {list(columns)}')
+        return df
+
+    except KeyError as e:
+        error_message = f'Error in accessing column: str{e}'
+        logging.error(error_message)
+        raise CustomException(error_message)
+
+
+def convert_to_arrow_strings(df, columns=('context', 'title', 'url')):
+    """
+    Converts text columns to the pyarrow-backed string dtype, which keeps the
+    text in contiguous UTF-8 buffers so the .str operations run without
+    boxing each value as a Python object
+
+    Args:
+        df (dataframe): Input dataframe with data to be changed
+        columns (tuple): Columns to convert (default is ('context', 'title', 'url'))
+
+    Raises:
+        CustomException: Raise KeyError if a column does not exist
+
+    Returns:
+        df: The transformed DataFrame after applying the  operations
+    """
+    try:
+        df = df.astype({column: 'string[pyarrow]' for column in columns})
+        logging.info(f'Converted columns to pyarrow strings: {list(columns)}')
+        return df
+
+    except KeyError as e:
+        error_message = f'Error in accessing column: str{e}'
+        logging.error(error_message)
+        raise CustomException(error_message)
+
+
 def rename_categories(df):
     """
     Renames the category column values to common names for similar types
@@ -28,7 +98,7 @@ def rename_categories(df):
         df: The transformed DataFrame after applying the  operations
     """
     try:
-        df['category'] = df['category'].replace({
+        category_names = {
             
                     'local news': 'Local-news',
                     'International_news': 'International-news',
@@ -40,10 +110,11 @@ def rename_categories(df):
                     'entertainment/all news': 'Entertainment-news',
                     'All news': 'All-news'
                     
-                })
-        return df
-
+                }
+        # For a categorical column the mapping runs once per category, not per row
+        df['category'] = df['category'].map(lambda name: category_names.get(name, name)).astype('category')
         logging.info(f'Updated category names')
+        return df
 
     except KeyError as e:
         error_message = f'Error in accessing column "category": str{e}'
@@ -66,7 +137,8 @@ def remove_whitespaces(df):
         dataframe: The transformed DataFrame after applying the  operations
     """
     try:
-        df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
+        text_cols = df.select_dtypes(include=['object', 'string']).columns
+        df[text_cols] = df[text_cols].apply(lambda col: col.str.strip())
         logging.info('Removed leading and trailing whitespaces from all columns')
         return df
         
@@ -102,6 +174,39 @@ def remove_duplicates(df):
         raise CustomException(error_message)
     
     
+def remove_duplicate_articles(df, wiki_site='si.wikipedia.org'):
+    """
+    Removes repeated news articles, i.e. rows with the same site, title and
+    passage, by comparing 64-bit row hashes. Meant to run first so that the
+    later passes work on a smaller frame.
+
+    Wiki rows are left alone since their title counts are used later by
+    filter_wiki_titles_by_occurrence; every other repeat would be dropped by
+    clean_and_deduplicate_df anyway.
+
+    Args:
+        df (dataframe): Dataframe to be cleaned
+        wiki_site (str): The site considered as 'wiki' (default is 'si.wikipedia.org').
+
+    Raises:
+        CustomException: Raise KeyError if columns not found
+
+    Returns:
+        dataframe: The transformed DataFrame after applying the  operations
+    """
+    try:
+        row_hashes = pd.util.hash_pandas_object(df[['site', 'title', 'context']], index=False)
+        duplicated = row_hashes.duplicated().to_numpy() & (df['site'] != wiki_site).to_numpy()
+        df = df[~duplicated]
+        logging.info(f'Removed {duplicated.sum()} repeated articles')
+        return df
+
+    except KeyError as e:
+        error_message = f'KeyError: {e} - Columns "site", "title" or "context" not found'
+        logging.error(error_message)
+        raise CustomException(error_message)
+    
+    
 def remove_lines_from_context(df,site:str):
     """
     Removes the unwanted lines from passages
@@ -117,33 +222,25 @@ def remove_lines_from_context(df,site:str):
         dataframe: The transformed DataFrame after applying the  operations
     """
     try:
-        def first_line_remover(df):
-               lines = df.split('\n')
-               # Keep everything after the first line
-               return '\n'.join(lines[1:]) if len(lines) > 1 else ''
-               logging.info(f'Not enough lines to remove in {site}')
-                
+        def first_line_remover(context):
+            # Keep everything after the first line, or nothing for single-line passages
+            return context.str.replace(r'^[^\n]*\n?', '', n=1, regex=True)
                 
-        def remove_first_and_last_lines(df, num_first=3):
-            lines = df.split('\n')
-            if len(lines) > num_first:
-                modified_text = '\n'.join(lines[num_first:])
-                # Find the index of the word "popular" 
-                popular_index = modified_text.find("popular")
-                if popular_index != -1:
-                    # Remove everything from "popular" onwards
-                    return modified_text[:popular_index].rstrip() 
                 
-                return modified_text.rstrip()  # If "popular" is not found, return the modified passage
-            else:
-                # If not enough lines, return an empty string
-                return ''
+        def remove_first_and_last_lines(context, num_first=3):
+            # Remove the first lines and everything from the word "popular" onwards
+            modified_text = context.str.replace(rf'^(?:[^\n]*\n){{{num_first}}}', '', n=1, regex=True)
+            modified_text = modified_text.str.replace(r'(?s)popular.*', '', n=1, regex=True).str.rstrip()
+            # If not enough lines, return an empty string
+            return modified_text.where(context.str.count('\n') >= num_first, '')
             
         if site == 'ada':
-            df.loc[df['site'] == 'ada', 'context'] = df.loc[df['site'] == 'ada', 'context'].apply(remove_first_and_last_lines)
+            site_mask = df['site'] == 'ada'
+            df.loc[site_mask, 'context'] = remove_first_and_last_lines(df.loc[site_mask, 'context'])
             logging.info(f'Removed lines from front and end of {site}')
         if site == 'lankadeepa':
-            df.loc[df['site'] == 'lankadeepa', 'context'] = df.loc[df['site'] == 'lankadeepa', 'context'].apply(first_line_remover)
+            site_mask = df['site'] == 'lankadeepa'
+            df.loc[site_mask, 'context'] = first_line_remover(df.loc[site_mask, 'context'])
             logging.info(f'Removed line from front of {site}')
     
         return df
@@ -169,7 +266,8 @@ def remove_new_lines(df):
         dataframe: The transformed DataFrame after applying the  operations
     """
     try:
-        df = df.apply(lambda x: x.str.replace('\n', ' ') if x.dtype == "object" else x)
+        text_cols = df.select_dtypes(include=['object', 'string']).columns
+        df[text_cols] = df[text_cols].apply(lambda col: col.str.replace('\n', ' ', regex=False))
         logging.info('Removed new lines from dataframe')
         return df
     except Exception as e:
@@ -216,7 +314,8 @@ def add_context_length(df):
         dataframe: The transformed DataFrame after applying the  operations
     """
     try:
-        df['context_length'] = df['context'].str.len()
+        # Arrow string lengths come from the offsets buffer, int32 is plenty for a passage
+        df['context_length'] = df['context'].str.len().astype('int32')
         return df
     
     except Exception as e:
@@ -262,9 +361,10 @@ def remove_special_characters(df):
         dataframe: dataframe: The transformed DataFrame after applying the  operations
     """
     try:
-        df['title'] = df['title'].str.replace('\t', '').str.replace('\r', '')
+        # Delete tabs and carriage returns in a single pass
+        df['title'] = df['title'].str.replace(r'[\t\r]', '', regex=True)
         return df    
-    except e as Exception:
+    except Exception as e:
         error_message = f'Error: {e} - Error in removing special characters'
         logging.error(error_message)
         raise CustomException(error_message)
@@ -284,13 +384,9 @@ def filter_non_english_text(df):
         DataFrame: The filtered DataFrame with non-English text only.
     """
     try:
-        # Define regular expressions 
-        special_char_pattern = re.compile(r'[^\w\s]', re.UNICODE)  # Special characters excluding word characters and spaces
-        english_letters_pattern = re.compile(r'[A-Za-z]')  # Matches English letters
-
         # Define counters for occurrences
-        df['special_char_count'] = df['context'].apply(lambda x: len(re.findall(special_char_pattern, x)))
-        df['english_letter_count'] = df['context'].apply(lambda x: len(re.findall(english_letters_pattern, x)))
+        df['special_char_count'] = df['context'].str.count(SPECIAL_CHAR_RE)
+        df['english_letter_count'] = df['context'].str.count(ENGLISH_LETTERS_RE)
 
         # Log the count of special characters and English letters
         logging.info(f"Special character count added: {df['special_char_count'].sum()}")
@@ -326,11 +422,8 @@ def drop_rows_with_special_chars(df, column_name='context'):
         DataFrame: The cleaned DataFrame with rows containing special characters removed.
     """
     try:
-        # Define the special characters to check for
-        special_chars = ['[', ']', '{', '}', '"', "'", '/', '\\']
-        
-        # Filter rows where the column contains any of the special characters
-        mask = df[column_name].apply(lambda x: any(char in x for char in special_chars))
+        # Filter rows where the column contains any of the special characters, in one regex pass
+        mask = df[column_name].str.contains(SPECIAL_CHARS_CLASS, regex=True, na=False)
 
         # Drop rows that contain any of the special characters
         df_cleaned = df[~mask]  # ~mask means we keep rows where mask is False (i.e., no special characters)
@@ -362,11 +455,8 @@ def filter_math_sequences(df):
         DataFrame: The filtered DataFrame with mathematical-like sequences removed.
     """
     try:
-        # Define regex pattern to detect sequences resembling mathematical equations
-        math_pattern = r'\d\s*[\+\-\*/^=]\s*\d'
-        
         # Apply the pattern to detect rows with mathematical-like sequences
-        math_rows = df['context'].str.contains(math_pattern)
+        math_rows = df['context'].str.contains(MATH_SEQUENCE_RE)
 
         # Log the number of rows containing mathematical-like sequences
         rows_with_math = math_rows.sum()
@@ -388,6 +478,42 @@ def filter_math_sequences(df):
 
 
 
+def filter_unwanted_passages(df):
+    """
+    Filter out rows whose 'context' contains English letters, special characters
+    or sequences that resemble mathematical equations, in a single regex pass.
+
+    Combines filter_non_english_text, drop_rows_with_special_chars and
+    filter_math_sequences without adding their counter columns.
+
+    Args:
+        df (DataFrame): The dataframe to be cleaned.
+
+    Raises:
+        CustomException: Raise error if filtering fails.
+
+    Returns:
+        DataFrame: The filtered DataFrame.
+    """
+    try:
+        # \p{Nd} is only understood by pyarrow's engine, Python's re needs its own pattern
+        uses_arrow = getattr(df['context'].dtype, 'storage', None) == 'pyarrow'
+        pattern = UNWANTED_PASSAGE_PATTERN if uses_arrow else UNWANTED_PASSAGE_PATTERN_PY
+        drop_mask = df['context'].str.contains(pattern, regex=True, na=False)
+        df_filtered = df[~drop_mask]
+
+        # Log the number of rows removed
+        logging.info(f"Dropped {drop_mask.sum()} rows with English letters, special characters or mathematical-like sequences.")
+
+        return df_filtered
+
+    except Exception as e:
+        error_message = f"Error during filtering of unwanted passages: {str(e)}"
+        logging.error(error_message)
+        raise CustomException(error_message)
+
+
+
 def filter_wiki_titles_by_occurrence(df, site='si.wikipedia.org', min_count=5):
     """
     Filter out rows where the 'title' column occurs less than a specified minimum count for a given site.
@@ -404,21 +530,25 @@ def filter_wiki_titles_by_occurrence(df, site='si.wikipedia.org', min_count=5):
         DataFrame: The filtered DataFrame with titles occurring less than the minimum count removed.
     """
     try:
-        # Step 1: Filter the DataFrame for the specified site
-        wiki_df = df[df['site'] == site]
-
-        # Step 2: Count the occurrences of each title within the specified site
-        title_counts_wiki = wiki_df['title'].value_counts()
+        # Step 1 & 2: Encode the site's titles as integer codes and count each code
+        site_mask = (df['site'] == site).to_numpy()
+        title_codes, titles = pd.factorize(df.loc[site_mask, 'title'])
+        has_title = title_codes >= 0  # Missing titles get code -1 and are never dropped
+        title_counts_wiki = np.bincount(title_codes[has_title], minlength=len(titles))
 
         # Step 3: Identify titles that occur less than the specified minimum count
-        titles_to_drop_wiki = title_counts_wiki[title_counts_wiki < min_count].index
+        rare_titles = title_counts_wiki < min_count
 
         # Log the number of titles being dropped
-        titles_dropped = len(titles_to_drop_wiki)
+        titles_dropped = int(rare_titles.sum())
         logging.info(f"Identified {titles_dropped} titles to drop that occur less than {min_count} times.")
 
         # Step 4: Drop rows from the original DataFrame where the site is specified and the title occurs less than the minimum count
-        df_filtered = df[~((df['site'] == site) & (df['title'].isin(titles_to_drop_wiki)))]
+        rare_rows = np.zeros(len(title_codes), dtype=bool)
+        rare_rows[has_title] = rare_titles[title_codes[has_title]]
+        drop_mask = np.zeros(len(df), dtype=bool)
+        drop_mask[site_mask] = rare_rows
+        df_filtered = df[~drop_mask]
 
         # Log the number of rows removed
         rows_dropped = len(df) - len(df_filtered)
@@ -448,32 +578,33 @@ def clean_and_deduplicate_df(df, wiki_site='si.wikipedia.org'):
         DataFrame: The cleaned and deduplicated DataFrame.
     """
     try:
-        # Step 1: Separate "wiki" and non-"wiki" rows
-        wiki_df = df[df['site'] == wiki_site]
-        non_wiki_df = df[df['site'] != wiki_site]
+        # Step 1: Locate "wiki" and non-"wiki" rows
+        wiki_mask = (df['site'] == wiki_site).to_numpy()
+        wiki_rows = np.flatnonzero(wiki_mask)
+        non_wiki_rows = np.flatnonzero(~wiki_mask)
 
         # Log the number of rows in each subset
-        logging.info(f"Number of wiki rows: {len(wiki_df)}")
-        logging.info(f"Number of non-wiki rows: {len(non_wiki_df)}")
+        logging.info(f"Number of wiki rows: {len(wiki_rows)}")
+        logging.info(f"Number of non-wiki rows: {len(non_wiki_rows)}")
 
         # Step 2: Drop duplicates in non-"wiki" rows based on 'title', keeping only the first occurrence
-        non_wiki_df = non_wiki_df.drop_duplicates(subset='title', keep='first')
+        non_wiki_rows = non_wiki_rows[~df['title'].take(non_wiki_rows).duplicated(keep='first').to_numpy()]
 
         # Log the number of rows after dropping duplicates based on 'title'
-        logging.info(f"Number of non-wiki rows after deduplication by title: {len(non_wiki_df)}")
+        logging.info(f"Number of non-wiki rows after deduplication by title: {len(non_wiki_rows)}")
 
-        # Step 3: Concatenate the "wiki" and deduplicated non-"wiki" data back together
-        df_combined = pd.concat([wiki_df, non_wiki_df])
+        # Step 3: Order the "wiki" rows before the deduplicated non-"wiki" rows, as positions only
+        row_order = np.concatenate([wiki_rows, non_wiki_rows])
 
         # Step 4: Drop duplicates in the 'context' column, keeping the first occurrence
-        df_combined = df_combined.drop_duplicates(subset='context', keep='first')
+        row_order = row_order[~df['context'].take(row_order).duplicated(keep='first').to_numpy()]
+
+        # Take the remaining rows in a single copy and reset the index
+        df_combined = df.take(row_order).reset_index(drop=True)
 
         # Log the number of rows after dropping duplicates based on 'context'
         logging.info(f"Number of rows after deduplication by context: {len(df_combined)}")
 
-        # (Optional) Reset the index if needed
-        df_combined = df_combined.reset_index(drop=True)
-
         logging.info("Data cleaning and deduplication completed successfully.")
         return df_combined
 
@@ -499,10 +630,10 @@ def ranging_passages(df):
     """
     try:
         # Add a new column for word count
-        df['word_count'] = df['context'].apply(lambda x: len(x.split()))
+        df['word_count'] = df['context'].str.count(f'[^{WHITESPACE_CLASS}]+')
 
         # Filter the dataframe for passages with word count between 300 and 3500
-        context_in_range = df[(df['word_count'] >= 25) & (df['word_count'] <= 250)]
+        context_in_range = df[df['word_count'].between(25, 250)]
 
         # Log the operation
         logging.info('Dropped passages out of range from 300-3500 words')
@@ -550,23 +681,18 @@ def write_to_json(df,path):
         path (str): Output path to save JSON file
     """
     try:
-        with open(path, 'w', encoding='utf-8') as file:
-            json.dump(
-                df.to_dict(orient='records'), 
-                file, 
-                indent=7,
-                ensure_ascii=False
-            )
+        with open(path, 'wb') as file:
+            file.write(json_dumps(df.to_dict(orient='records')))
             logging.info(f'Dataframe written to JSON file: {path}')
             print(f"DataFrame successfully written to {path}.")
             
     except FileNotFoundError as e:
-        error_message = f'FileNotFoundError: {e} -  The specified file path "{file_path}" does not exist.'
+        error_message = f'FileNotFoundError: {e} -  The specified file path "{path}" does not exist.'
         logging.error(error_message)
         raise CustomException(error_message)
         
     except PermissionError as e :
-        error_message = f'PermissionError: {e} - Do not have permission to write to "{file_path}".'
+        error_message = f'PermissionError: {e} - Do not have permission to write to "{path}".'
         logging.error(error_message)
         raise CustomException(error_message)
         
@@ -601,11 +727,23 @@ def stratified_train_test_dev_split(df, path: str, test_size=0.1, dev_size=0.1,
         CustomException: Raise error if splitting fails.
     """
     try:
-        # First, split into train and temp (for dev and test) sets
-        train_df, temp_df = train_test_split(df, test_size=test_size + dev_size, stratify=df['site'], random_state=random_state)  # 80% train, 20% remaining
-
-        # Split temp_df into dev and test sets
-        dev_df, test_df = train_test_split(temp_df, test_size=0.5, stratify=temp_df['site'], random_state=random_state)  # Split the remaining 20% into 10% dev and 10% test
+        # Shuffle each site once and slice it into train, dev and test positions
+        rng = np.random.default_rng(random_state)
+        train_idx, dev_idx, test_idx = [], [], []
+        for positions in df.groupby('site', observed=True).indices.values():
+            positions = rng.permutation(positions)
+            num_rows = len(positions)
+            num_dev = int(np.floor(dev_size * num_rows))
+            num_test = int(np.floor(test_size * num_rows))
+            num_train = num_rows - num_dev - num_test  # Train takes the rounding remainder, ~80%
+            train_idx.append(positions[:num_train])
+            dev_idx.append(positions[num_train:num_train + num_dev])
+            test_idx.append(positions[num_train + num_dev:])
+
+        # Mix the sites within each split
+        train_df = df.iloc[rng.permutation(np.concatenate(train_idx))]
+        dev_df = df.iloc[rng.permutation(np.concatenate(dev_idx))]
+        test_df = df.iloc[rng.permutation(np.concatenate(test_idx))]
 
         # Define file paths
         test_path = f'{path}/test.json'
@@ -623,16 +761,16 @@ def stratified_train_test_dev_split(df, path: str, test_size=0.1, dev_size=0.1,
         test_df['index'] = test_df.index
 
         # Save the splits into separate JSON files
-        with open(train_path, 'w', encoding='utf-8') as f_train:
-            json.dump(train_df.to_dict(orient='records'), f_train, indent=7, ensure_ascii=False)
+        with open(train_path, 'wb') as f_train:
+            f_train.write(json_dumps(train_df.to_dict(orient='records')))
             logging.info(f'Created train dataset at {train_path}')
 
-        with open(dev_path, 'w', encoding='utf-8') as f_dev:
-            json.dump(dev_df.to_dict(orient='records'), f_dev, indent=7, ensure_ascii=False)
+        with open(dev_path, 'wb') as f_dev:
+            f_dev.write(json_dumps(dev_df.to_dict(orient='records')))
             logging.info(f'Created dev dataset at {dev_path}')
 
-        with open(test_path, 'w', encoding='utf-8') as f_test:
-            json.dump(test_df.to_dict(orient='records'), f_test, indent=7, ensure_ascii=False)
+        with open(test_path, 'wb') as f_test:
+            f_test.write(json_dumps(test_df.to_dict(orient='records')))
             logging.info(f'Created test dataset at {test_path}')
 
         print("Data successfully split into train, dev, and test sets!")
@@ -643,6 +781,61 @@ def stratified_train_test_dev_split(df, path: str, test_size=0.1, dev_size=0.1,
         raise CustomException(error_message)
 
     
+def clean_site_partition(df):
+    """
+    Runs the cleaning steps that only look at rows of the same site on one
+    site's rows
+
+    Args:
+        df (DataFrame): The rows of a single site
+
+    Returns:
+        DataFrame: The cleaned rows, keeping their original index labels
+    """
+    df = remove_duplicate_articles(df)
+    df = convert_to_categorical(df)
+    df = convert_to_arrow_strings(df)
+    df = rename_categories(df)
+    df = filter_unwanted_passages(df)
+    df = filter_wiki_titles_by_occurrence(df)
+    df = remove_lines_from_context(df,'lankadeepa')
+    df = remove_new_lines(df)
+    return df
+
+
+def clean_by_site(df, max_workers=None):
+    """
+    Cleans each site's rows in a separate process with clean_site_partition
+    and puts the results back together in the original row order
+
+    Args:
+        df (DataFrame): The dataframe to be cleaned
+        max_workers (int): Number of worker processes (default is one per CPU)
+
+    Raises:
+        CustomException: Raise error if cleaning a partition fails
+
+    Returns:
+        DataFrame: The cleaned DataFrame
+    """
+    try:
+        partitions = [partition for _, partition in df.groupby('site', sort=False, dropna=False)]
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            cleaned = list(executor.map(clean_site_partition, partitions))
+
+        # Partitions carry their own categories, convert again once they are combined
+        df = pd.concat(cleaned).sort_index()
+        df = convert_to_categorical(df)
+        logging.info(f'Cleaned {len(partitions)} site partitions in parallel')
+        return df
+
+    except Exception as e:
+        error_message = f'Error: {e} - Error in cleaning site partitions'
+        logging.error(error_message)
+        raise CustomException(error_message)
+
+    
 if __name__ == "__main__":
     try: 
     
@@ -650,21 +843,13 @@ if __name__ == "__main__":
         
 
         df = data_loader(MERGED_DATA_PATH)
-        df = rename_categories(df)
-        df = filter_non_english_text(df)
-        df = drop_rows_with_special_chars(df)
-        df = filter_math_sequences(df)
-        df = filter_wiki_titles_by_occurrence(df)
-        df = remove_lines_from_context(df,'lankadeepa')
-        df = remove_new_lines(df)
+        df = clean_by_site(df)
         df = clean_and_deduplicate_df(df)
         df = remove_empty_passages(df)
         df = add_context_length(df)
         df = sort_by_title(df)
         df = remove_special_characters(df)
         df = ranging_passages(df)
-        df = remove_new_lines(df)
-        df = drop_columns(df, ['special_char_count', 'english_letter_count'])
         write_to_json(df,path)
         stratified_train_test_dev_split(df,OUTPUT_PATH)
         print(df.shape)
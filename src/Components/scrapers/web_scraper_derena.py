@@ -1,24 +1,90 @@
 import re
-import json
 import yaml
 import sys
 import html
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from urllib.parse import urlparse
 from pathlib import Path
+from bs4 import SoupStrainer
 from tqdm import tqdm
-from src.utils import get_parsed_html, get_unique_id, load_config
+from src.utils import get_parsed_html, get_unique_id, load_config, json_dumps, close_session, warm_up_session
 from src.logger import logging
 from src.exception import CustomException
      
 
-def scrape_article(url, sitename:str,path:str):
+PAGE_WORKERS = 4      # listing pages scraped at once
+ARTICLE_WORKERS = 8   # articles fetched at once per listing page
+
+# Only the parts of each page that are read are turned into a tree
+LISTING_STRAINER = SoupStrainer('div', class_='news-story')
+ARTICLE_STRAINER = SoupStrainer(['h1', 'p'])
+
+# Serialises appends to the shared JSONL output from the page threads
+WRITE_LOCK = threading.Lock()
+
+
+def scrape_story(details, url, sitename:str):
+    """
+    Fetches a single story linked from a listing page.
+
+    Args:
+        details (Tag): The listing entry linking to the story.
+        url (str): The URL of the listing page.
+        sitename(str): The name of the site HTML content is scraped from
+
+    Returns:
+        dict: The article record, or None if the story could not be scraped.
+    """
+    try:
+        content_url = details.find('a').get('href')
+        parsed_url =urlparse(url)
+        base_url = f'{parsed_url.scheme}://{parsed_url.netloc}'
+        artical_url = f'{base_url}/{content_url}'
+        article = get_parsed_html(artical_url, parse_only=ARTICLE_STRAINER)
+        
+        title = article.find('h1',  class_ = 'news-heading').text    
+        content = article.find_all('p', style = 'text-align:justify')
+    
+        context = []
+        for paragraph in content:
+            if paragraph.find('img'):
+                continue
+
+            context.append(paragraph.get_text(strip=True))
+        context_text = '\n'.join(context)
+        text  = html.unescape(context_text)       
+        id =  get_unique_id()
+       
+    
+        return {
+            'category': category,
+            'site':sitename,
+            'url':content_url,
+            'title': title,
+            'context': text,
+            'id': id
+        }
+        
+            
+    except Exception as e:
+        error_message = f"Error fetching {url}: {str(e)}"
+        logging.error(error_message)
+        return None
+
+
+def scrape_article(url, sitename:str, output_file):
     """
     Fetches and extracts HTML content from a given URL.
 
+    The stories linked from the listing page are fetched concurrently over
+    the shared session from get_parsed_html, and the page's records are appended in a single write.
+
     Args:
         url (str): The URL to fetch the HTML content from.
         sitename(str): The name of the site HTML content is scraped from
-        path(str): The path to output folder
+        output_file (BufferedWriter): The JSONL file opened for appending in binary mode
 
     Raises:
         CustomException: If there's an issue with fetching the data, 
@@ -27,62 +93,19 @@ def scrape_article(url, sitename:str,path:str):
         None
                             
     Expected Output:
-        A JSON file is created at "path/to/save/data/{article_id}.json" containing:
-        {
-            "category": "local",
-            "site": "example_news",
-            "url": "https://www.example.com/articles/123",
-            "title": "Sample Article Title",
-            "context": "This is the content of the article.",
-            "id": "unique_article_id"
-        }
+        One line is appended to "path/to/save/data/{sitename}.jsonl" per article:
+        {"category": "local", "site": "example_news", "url": "https://www.example.com/articles/123", "title": "Sample Article Title", "context": "This is the content of the article.", "id": "unique_article_id"}
     """
     try:
-        s = get_parsed_html(url).find_all('div', {'class': 'news-story'})
+        s = get_parsed_html(url, parse_only=LISTING_STRAINER).find_all('div', {'class': 'news-story'})
         
-        article_info = []
-
-        for idx, details in tqdm (enumerate(s,start=1)):
-            try:
-                content_url = details.find('a').get('href')
-                parsed_url =urlparse(url)
-                base_url = f'{parsed_url.scheme}://{parsed_url.netloc}'
-                artical_url = f'{base_url}/{content_url}'
-                article = get_parsed_html(artical_url)
-                
-                title = article.find('h1',  class_ = 'news-heading').text    
-                content = article.find_all('p', style = 'text-align:justify')
-            
-                context = []
-                for paragraph in content:
-                    if paragraph.find('img'):
-                        continue
-  
-                    context.append(paragraph.get_text(strip=True))
-                context_text = '\n'.join(context)
-                text  = html.unescape(context_text)       
-                id =  get_unique_id()
-               
-            
-                article_info = {
-                    'category': category,
-                    'site':sitename,
-                    'url':content_url,
-                    'title': title,
-                    'context': text,
-                    'id': id
-                }
-     
-                
-                file_path = path/sitename/f'{id}.json'
-                with open(file_path, "w", encoding='utf-8') as f:
-                    json.dump(article_info, f, ensure_ascii=False, indent=4)
-                
-                    
-            except Exception as e:
-                error_message = f"Error fetching {url}: {str(e)}"
-                logging.error(error_message)
-                continue
+        with ThreadPoolExecutor(max_workers=ARTICLE_WORKERS) as executor:
+            records = [record for record in executor.map(partial(scrape_story, url=url, sitename=sitename), s)
+                       if record is not None]
+
+        batch = b''.join(json_dumps(record, indent=False) + b'\n' for record in records)
+        with WRITE_LOCK:
+            output_file.write(batch)
         
     except Exception as e:
         error_message = f"Error fetching content from {url}: {str(e)}"
@@ -105,13 +128,20 @@ if __name__ == "__main__":
     SOURCE_URL = SOURCE_URL_LOCAL
     category = 'Local-news'
     
-    for page in tqdm(range(13 ,TOTAL_PAGES), desc=f"Scraping {SITE_NAME}", unit="page"):
-        url = f"{SOURCE_URL}pageno={page}"
-        scrape_article(url, SITE_NAME,OUTPUT_PATH)
-        print(f"Completed scraping page: {page}")
-        logging.info(f"Successfully scraped page: {page}")
+    pages = range(13 ,TOTAL_PAGES)
+    urls = [f"{SOURCE_URL}pageno={page}" for page in pages]
+    warm_up_session(SOURCE_URL)
+
+    OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_PATH/f'{SITE_NAME}.jsonl', 'ab') as output_file, \
+            ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        results = executor.map(partial(scrape_article, sitename=SITE_NAME, output_file=output_file), urls)
+        for page, _ in tqdm(zip(pages, results), total=len(pages), desc=f"Scraping {SITE_NAME}", unit="page"):
+            print(f"Completed scraping page: {page}")
+            logging.info(f"Successfully scraped page: {page}")
 
     
+    close_session()
     print(f"Completed scraping all pages for: {SITE_NAME}")
     logging.info(f"Successfully scraped Site: {SITE_NAME}")
 
@@ -1,17 +1,16 @@
 import re
-import json
 import yaml
 import sys
 import html
 from urllib.parse import urlparse
 from pathlib import Path
 from tqdm import tqdm
-from src.utils import get_parsed_html, get_unique_id, load_config
+from src.utils import get_parsed_html, get_unique_id, load_config, json_dumps, open_directory, write_file_at
 from src.logger import logging
 from src.exception import CustomException
      
 
-def scrape_article(url, sitename:str,path:str):
+def scrape_article(url, sitename:str,path:str, dir_fd:int = None):
     """
     Fetches and extracts HTML content from a given URL.
 
@@ -19,6 +18,7 @@ def scrape_article(url, sitename:str,path:str):
         url (str): The URL to fetch the HTML content from.
         sitename(str): The name of the site HTML content is scraped from
         path(str): The path to output folder
+        dir_fd(int, optional): Descriptor of the site's output folder from open_directory
 
     Raises:
         CustomException: If there's an issue with fetching the data, 
@@ -64,9 +64,7 @@ def scrape_article(url, sitename:str,path:str):
                 }
      
                 
-                file_path = path/sitename/f'{id}.json'
-                with open(file_path, "w", encoding='utf-8') as f:
-                    json.dump(article_info, f, ensure_ascii=False, indent=4)
+                write_file_at(path/sitename, f'{id}.json', json_dumps(article_info), dir_fd=dir_fd)
                 
                     
             except Exception as e:
@@ -95,11 +93,12 @@ if __name__ == "__main__":
     SOURCE_URL = SOURCE_URL_INT
     category = 'International-news'
     
-    for page in tqdm(range(62 ,TOTAL_PAGES), desc=f"Scraping {SITE_NAME}", unit="page"):
-        url = f"{SOURCE_URL}/page/{page}/"
-        scrape_article(url, SITE_NAME,OUTPUT_PATH)
-        print(f"Completed scraping page: {page}")
-        logging.info(f"Successfully scraped page: {page}")
+    with open_directory(OUTPUT_PATH/SITE_NAME) as dir_fd:
+        for page in tqdm(range(62 ,TOTAL_PAGES), desc=f"Scraping {SITE_NAME}", unit="page"):
+            url = f"{SOURCE_URL}/page/{page}/"
+            scrape_article(url, SITE_NAME, OUTPUT_PATH, dir_fd)
+            print(f"Completed scraping page: {page}")
+            logging.info(f"Successfully scraped page: {page}")
 
     
     print(f"Completed scraping all pages for: {SITE_NAME}")
@@ -1,78 +1,166 @@
 import re
-import json
 import yaml
-import sys
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from tqdm import tqdm
-from src.utils import get_parsed_html, get_unique_id, load_config
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.utils import get_html_tree, iter_html_elements, get_unique_id, load_config, warm_up_session
 from src.logger import logging
-from src.exception import CustomException
      
 
-def scrape_article(url, sitename:str,path:str):
+PAGE_WORKERS = 8           # listing pages scraped at once
+ARTICLE_WORKERS = 20       # articles fetched at once per listing page
+MAX_OPEN_REQUESTS = 20     # requests in flight to the site at any time
+REQUEST_INTERVAL = 0.1     # seconds between the start of two requests
+
+_REQUEST_SLOTS = threading.BoundedSemaphore(MAX_OPEN_REQUESTS)
+_SCHEDULE_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+# Scraped articles are stored column-wise, ROW_GROUP_SIZE articles per row group
+ARTICLE_SCHEMA = pa.schema([(name, pa.string()) for name in ('category', 'site', 'url', 'title', 'context', 'id')])
+ROW_GROUP_SIZE = 1000
+
+
+@contextmanager
+def _polite_request():
     """
-    Fetches and extracts HTML content from a given URL.
+    Holds one of the MAX_OPEN_REQUESTS request slots, and waits until at least
+    REQUEST_INTERVAL has passed since the previous request started.
+    """
+    global _next_request_at
+    with _REQUEST_SLOTS:
+        with _SCHEDULE_LOCK:
+            now = time.monotonic()
+            start_at = max(now, _next_request_at)
+            _next_request_at = start_at + REQUEST_INTERVAL
+        time.sleep(start_at - now)
+        yield
+
+
+def polite_get_html_tree(url):
+    """
+    Fetches and parses a page like get_html_tree, but spaces requests to the
+    site REQUEST_INTERVAL apart and caps how many are in flight at once.
 
     Args:
         url (str): The URL to fetch the HTML content from.
+
+    Returns:
+        LexborHTMLParser: Parsed HTML tree.
+    """
+    with _polite_request():
+        return get_html_tree(url)
+
+
+def _is_article_row(element):
+    """Matches the listing entries, <div class="row" style="margin-bottom:10px">."""
+    return 'row' in (element.get('class') or '').split() and element.get('style') == 'margin-bottom:10px'
+
+
+def get_article_links(url):
+    """
+    Collects the article links of a listing page, stream-parsing the page so
+    only one listing entry is held in memory at a time.
+
+    Args:
+        url (str): The URL of the listing page.
+
+    Returns:
+        list: The first https link of each listing entry, None for entries without one.
+    """
+    with _polite_request():
+        return [
+            next((a.get('href') for a in row.iter('a') if (a.get('href') or '').startswith('https://')), None)
+            for row in iter_html_elements(url, 'div', match=_is_article_row)
+        ]
+
+
+def scrape_story(content_url, url, sitename:str, category:str):
+    """
+    Fetches a single story linked from a listing page.
+
+    Args:
+        content_url (str): The link to the story, None if the listing entry had none.
+        url (str): The URL of the listing page.
         sitename(str): The name of the site HTML content is scraped from
-        path(str): The path to output folder
+        category(str): The news category the articles are filed under
 
-    Raises:
-        CustomException: If there's an issue with fetching the data, 
-                         a custom exception is raised with details.
     Returns:
-        None
-                            
-    Expected Output:
-        A JSON file is created at "path/to/save/data/{article_id}.json" containing:
-        {
-            "category": "local",
-            "site": "example_news",
-            "url": "https://www.example.com/articles/123",
-            "title": "Sample Article Title",
-            "context": "This is the content of the article.",
-            "id": "unique_article_id"
-        }
+        dict: The article record, or None if the story could not be scraped.
     """
     try:
-        s = get_parsed_html(url).find_all('div', {'class': 'row', 'style':'margin-bottom:10px'})
+        if content_url is None:
+            raise ValueError("Listing entry has no article link")
+        main_content = polite_get_html_tree(content_url)
+        title = main_content.css_first('h1.main-tittle').text()
+        context = main_content.css_first('div#article-phara').text()
+        id =  get_unique_id()
         
         
-        article_info = []
-
-        for idx, details in tqdm (enumerate(s,start=1)):
-            try:
-                content_url = details.find('a', attrs ={'href': re.compile("^https://")}).get('href')
-                main_content = get_parsed_html(content_url)
-                title = main_content.find('h1', class_ = 'main-tittle').text
-                context = main_content.find('div', id = 'article-phara').text
-                id =  get_unique_id()
-                
-                
-                article_info = {
-                    'category': category,
-                    'site':sitename,
-                    'url':content_url,
-                    'title': title,
-                    'context': context,
-                    'id': id
-                }
-                
-                file_path = path/sitename/f'{id}.json'
-                with open(file_path, "w", encoding='utf-8') as f:
-                    json.dump(article_info, f, ensure_ascii=False, indent=4)
-                
-                    
-            except Exception as e:
-                error_message = f"Error fetching {url}: {str(e)}"
-                logging.error(error_message)
-                continue
+        return {
+            'category': category,
+            'site':sitename,
+            'url':content_url,
+            'title': title,
+            'context': context,
+            'id': id
+        }
+        
+            
+    except Exception as e:
+        error_message = f"Error fetching {url}: {str(e)}"
+        logging.error(error_message)
+        return None
+
+
+def scrape_article(url, sitename:str, category:str):
+    """
+    Fetches and extracts HTML content from a given URL.
+
+    The stories linked from the listing page are fetched concurrently, paced
+    by polite_get_html_tree. Listing pages may be scraped from several threads at once.
+
+    Args:
+        url (str): The URL to fetch the HTML content from.
+        sitename(str): The name of the site HTML content is scraped from
+        category(str): The news category the articles are filed under
+
+    Returns:
+        list: One record per article scraped from the page, empty if the listing
+        page could not be fetched, so one failed page doesn't end the run:
+        {"category": "local", "site": "example_news", "url": "https://www.example.com/articles/123", "title": "Sample Article Title", "context": "This is the content of the article.", "id": "unique_article_id"}
+    """
+    try:
+        s = get_article_links(url)
+        
+        with ThreadPoolExecutor(max_workers=ARTICLE_WORKERS) as executor:
+            return [record for record in executor.map(partial(scrape_story, url=url, sitename=sitename, category=category), s)
+                    if record is not None]
         
     except Exception as e:
         error_message = f"Error fetching content from {url}: {str(e)}"
         logging.error(error_message)
-        raise CustomException(error_message, sys)
+        return []
+
+
+def write_row_group(writer, columns:dict):
+    """
+    Writes the buffered article columns to the Parquet file as one row group
+    and empties the buffers.
+
+    Args:
+        writer (pq.ParquetWriter): The open Parquet file.
+        columns (dict): One list of values per field of ARTICLE_SCHEMA.
+    """
+    writer.write_table(pa.table(columns, schema=ARTICLE_SCHEMA))
+    for values in columns.values():
+        values.clear()
             
         
         
@@ -92,11 +180,34 @@ if __name__ == "__main__":
     SOURCE_URL = SOURCE_URL_BUSINESS
     category = SOURCE_URL.split('/', maxsplit=3)[-1].split('.', maxsplit=1)[0].replace('-',' ')
     
-    for page in tqdm(range(17, TOTAL_PAGES), desc=f"Scraping {SITE_NAME}", unit="page"):
-        url = f"{SOURCE_URL}pageID={page}"
-        scrape_article(url, SITE_NAME,OUTPUT_PATH)
-        print(f"Completed scraping page: {page}")
-        logging.info(f"Successfully scraped page: {page}")
+    warm_up_session(SOURCE_URL)
+    pages = range(17, TOTAL_PAGES)
+    url_tmpl = SOURCE_URL + "pageID={}"
+    urls = [url_tmpl.format(page) for page in pages]
+
+    # Articles are buffered column by column and written as zstd-compressed row groups
+    columns = {name: [] for name in ARTICLE_SCHEMA.names}
+    OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+    # Parquet can't be appended to, so every run gets its own file; the category
+    # keeps the URL's '/' and is reduced to a safe file name first
+    file_category = re.sub(r'[^\w]+', '_', category)
+    run_stamp = time.strftime('%Y%m%d-%H%M%S')
+    output_file = OUTPUT_PATH/f"{SITE_NAME}_{file_category}_pages_{pages[0]}-{pages[-1]}_{run_stamp}.parquet"
+    with pq.ParquetWriter(output_file, ARTICLE_SCHEMA, compression='zstd') as writer, \
+            ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+        results = executor.map(partial(scrape_article, sitename=SITE_NAME, category=category), urls)
+        try:
+            for page, records in tqdm(zip(pages, results), total=len(pages), desc=f"Scraping {SITE_NAME}", unit="page"):
+                for name, values in columns.items():
+                    values.extend(record[name] for record in records)
+                if len(columns['id']) >= ROW_GROUP_SIZE:
+                    write_row_group(writer, columns)
+                print(f"Completed scraping page: {page}")
+                logging.info(f"Successfully scraped page: {page}")
+        finally:
+            # Keep the articles scraped so far even if the run is interrupted
+            if columns['id']:
+                write_row_group(writer, columns)
 
     
     print(f"Completed scraping all pages for: {SITE_NAME}")
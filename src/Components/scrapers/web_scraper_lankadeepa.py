@@ -1,16 +1,19 @@
-import re
-import json
 import yaml
 import sys
 import html
 from pathlib import Path
 from tqdm import tqdm
-from src.utils import get_parsed_html, get_unique_id, load_config
+from src.utils import get_parsed_html, get_unique_id, load_config, json_dumps, open_directory, write_file_at
 from src.logger import logging
 from src.exception import CustomException
      
 
-def scrape_article(url, sitename:str,path:str):
+def _is_https_href(href):
+    """Matches absolute https links, without running a regex per link."""
+    return isinstance(href, str) and href.startswith('https://')
+
+
+def scrape_article(url, sitename:str,path:str, dir_fd:int = None):
     """
     Fetches and extracts HTML content from a given URL.
 
@@ -18,6 +21,7 @@ def scrape_article(url, sitename:str,path:str):
         url (str): The URL to fetch the HTML content from.
         sitename(str): The name of the site HTML content is scraped from
         path(str): The path to output folder
+        dir_fd(int, optional): Descriptor of the site's output folder from open_directory
 
     Raises:
         CustomException: If there's an issue with fetching the data, 
@@ -43,7 +47,7 @@ def scrape_article(url, sitename:str,path:str):
 
         for idx, details in tqdm (enumerate(s,start=1)):
             try:
-                content_url = details.find('a', attrs ={'href': re.compile("^https://")}).get('href')
+                content_url = details.find('a', attrs ={'href': _is_https_href}).get('href')
                 article = get_parsed_html(content_url)
                 title = article.find('h3', class_ = 'f1-l-3 cl2 p-b-0 respon2').text    
                 content = article.find_all('p', style = 'text-align: justify;')
@@ -71,9 +75,7 @@ def scrape_article(url, sitename:str,path:str):
                 }
                 
                
-                file_path = path/sitename/f'{id}.json'
-                with open(file_path, "w", encoding='utf-8') as f:
-                    json.dump(article_info, f, ensure_ascii=False, indent=4)
+                write_file_at(path/sitename, f'{id}.json', json_dumps(article_info), dir_fd=dir_fd)
                 
                     
             except Exception as e:
@@ -100,11 +102,12 @@ if __name__ == "__main__":
     
     category = 'All news'
     
-    for page in tqdm(range(10 ,TOTAL_PAGES), desc=f"Scraping {SITE_NAME}", unit="page"):
-        url = f"{SOURCE_URL}/{page*30}"
-        scrape_article(url, SITE_NAME,OUTPUT_PATH)
-        print(f"Completed scraping page: {page}")
-        logging.info(f"Successfully scraped page: {page}")
+    with open_directory(OUTPUT_PATH/SITE_NAME) as dir_fd:
+        for page in tqdm(range(10 ,TOTAL_PAGES), desc=f"Scraping {SITE_NAME}", unit="page"):
+            url = f"{SOURCE_URL}/{page*30}"
+            scrape_article(url, SITE_NAME, OUTPUT_PATH, dir_fd)
+            print(f"Completed scraping page: {page}")
+            logging.info(f"Successfully scraped page: {page}")
 
     
     print(f"Completed scraping all pages for: {SITE_NAME}")
@@ -1,13 +1,72 @@
 import logging
 import sys
-import re
-import json
 import yaml
 import gzip
-import time
+import io
+import os
+import asyncio
+from itertools import islice
+import aiohttp
 from pathlib import Path
-from src.utils import get_parsed_html, get_unique_id, load_config
+from selectolax.lexbor import LexborHTMLParser
+from src.utils import get_unique_id, load_config, json_dumps, json_loads, REQUEST_TIMEOUT
 from src.logger import logging
+from src.exception import CustomException
+
+# Faster inflaters for the titles file, tried in order before the standard library
+try:
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
+try:
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+# Optional HTTP/2 client, used when WIKI_HTTP2 is set in the config
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+READ_BUFFER_SIZE = 128 * 1024  # bytes inflated per read of the titles file
+CONCURRENT_REQUESTS = 8   # articles fetched at once
+MAX_REQUESTS_PER_SECOND = 0.2  # one request every 5 seconds across the crawl
+DNS_CACHE_TTL = 600       # seconds a resolved host address is reused
+MAX_PARAGRAPHS = 10       # paragraphs kept per article
+
+# Deletes Sinhala characters and whitespace (all of which are below U+3001), so a
+# title made of only those translates to an empty string
+_SINHALA_AND_SPACE = str.maketrans('', '', ''.join(
+    chr(c) for c in range(0x3001) if 0x0D80 <= c <= 0x0DFF or chr(c).isspace()
+))
+
+def is_sinhala_title(title):
+    """
+    Checks that a title contains only Sinhala characters and spaces, in a
+    single C-level translate pass instead of a regex match.
+    Args:
+        title (str): The title to check.
+    Returns:
+        bool: True if the title is non-empty and only Sinhala characters and spaces.
+    """
+    return bool(title) and not title.translate(_SINHALA_AND_SPACE)
+
+def _open_gzip(file_path):
+    """
+    Opens a gzipped file for binary reading with the fastest inflater installed:
+    rapidgzip (parallel, across all cores), then ISA-L's igzip, then gzip.
+    Args:
+        file_path (str): The path to the gzipped file.
+    Returns:
+        A binary file object yielding the decompressed content.
+    """
+    if rapidgzip is not None:
+        return rapidgzip.open(str(file_path), parallelization=os.cpu_count() or 1)
+    if igzip is not None:
+        return igzip.open(file_path, 'rb')
+    return gzip.open(file_path, 'rb')
 
 def read_all_titles(file_path):
     """
@@ -24,7 +83,9 @@ def read_all_titles(file_path):
     """
     titles = []
     try:
-        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+        # Decompress and decode in large blocks rather than line-sized reads
+        with _open_gzip(file_path) as gz, \
+                io.TextIOWrapper(io.BufferedReader(gz, buffer_size=READ_BUFFER_SIZE), encoding='utf-8') as f:
             for line in f:
                 titles.append(line.strip())
     except FileNotFoundError:
@@ -47,8 +108,8 @@ def save_titles_to_json(titles, filename):
         CustomException: If there is an error during the file saving process.
     """
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(titles, f, ensure_ascii=False, indent=4)
+        with open(filename, 'wb') as f:
+            f.write(json_dumps(titles))
         print(f"Successfully saved {len(titles)} titles to {filename}.")
     except FileNotFoundError:
         logging.error(f"Directory not found for file: {filename}. Please check the path.")
@@ -57,16 +118,27 @@ def save_titles_to_json(titles, filename):
         logging.error(error_message)
         raise CustomException(error_message, sys)
 
-import re
-import json
-import logging
-import time
+async def fetch(session, url):
+    """
+    Fetches the raw content of a page.
+    Args:
+        session (aiohttp.ClientSession | httpx.AsyncClient): The session to fetch with.
+        url (str): The URL to fetch.
+    Returns:
+        bytes: The response body.
+    """
+    if httpx is not None and isinstance(session, httpx.AsyncClient):
+        response = await session.get(url)
+        return response.content
+    async with session.get(url) as response:
+        return await response.read()
 
-def scrape_wikipedia_content(title):
+async def scrape_wikipedia_content(session, title):
     """
     Scrapes the title and first three paragraphs from a Wikipedia article in Sinhala.
     Each paragraph is saved as a separate entry with the same metadata.
     Args:
+        session (aiohttp.ClientSession | httpx.AsyncClient): The session to fetch the article with.
         title (str): The title of the Wikipedia article to scrape.
     Returns:
         list: A list of dictionaries, each containing the article metadata for a paragraph.
@@ -75,21 +147,29 @@ def scrape_wikipedia_content(title):
     """
     try:
         url = f"https://si.wikipedia.org/wiki/{title.replace(' ', '_')}"
-        soup = get_parsed_html(url)
+        soup = LexborHTMLParser(await fetch(session, url))
+        # Drop inline TemplateStyles and scripts, text() would include their contents
+        soup.strip_tags(['script', 'style'])
         
         if not soup:
             return []
 
         # Extract the title
-        article_title = soup.find('h1', {'id': 'firstHeading'})
+        article_title = soup.css_first('h1#firstHeading')
         if article_title:
-            article_title = article_title.get_text()
+            article_title = article_title.text()
         else:
             logging.warning(f"Title not found for {url}")
             return []  # Skip if title is not found
 
-        # Extract paragraphs (first three)
-        paragraphs = [p.get_text() for p in soup.find_all('p') if p.get_text().strip()]
+        # Extract the first non-empty paragraphs, extracting each text once and stopping at the limit
+        paragraphs = []
+        for p in soup.css('p'):
+            text = p.text()
+            if text.strip():
+                paragraphs.append(text)
+                if len(paragraphs) == MAX_PARAGRAPHS:
+                    break
         if not paragraphs:
             logging.warning(f"No paragraphs found for {url}")
             return []  # Skip if no paragraphs found
@@ -99,7 +179,7 @@ def scrape_wikipedia_content(title):
 
         # Create a list of article info dictionaries for each paragraph
         article_info_list = []
-        for i, para in enumerate(paragraphs[:10]):  # Only take the first 10 paragraphs
+        for i, para in enumerate(paragraphs):  # Only the first MAX_PARAGRAPHS paragraphs
             article_info = {
                 'category': 'Wiki',
                 'site': 'si.wikipedia.org',
@@ -118,21 +198,95 @@ def scrape_wikipedia_content(title):
         raise CustomException(error_message)
 
 
+def rate_limiter(rate):
+    """
+    Builds a limiter that lets at most `rate` requests start per second,
+    shared by every task awaiting it. A request waits only for its own turn,
+    so a fast response is followed immediately by the next queued request.
+    Args:
+        rate (float): Allowed request starts per second.
+    Returns:
+        Callable: A coroutine function to await before each request.
+    """
+    interval = 1 / rate
+    next_start = 0.0
+
+    async def wait():
+        nonlocal next_start
+        now = asyncio.get_running_loop().time()
+        start_at = max(now, next_start)
+        next_start = start_at + interval  # Claimed before sleeping, so turns never overlap
+        await asyncio.sleep(start_at - now)
+
+    return wait
+
+async def _scrape_titles(titles, total, http2=False):
+    """
+    Scrapes the given articles concurrently over one session, with at most
+    CONCURRENT_REQUESTS requests in flight and MAX_REQUESTS_PER_SECOND started per second.
+    Args:
+        titles (Iterable of tuple): (position, title) pairs of the articles to scrape.
+        total (int): Number of articles requested, for progress messages.
+        http2 (bool): Multiplex the requests over one HTTP/2 connection with httpx
+                      instead of a pool of aiohttp HTTP/1.1 connections.
+    Returns:
+        list: The article info lists, in the order of the titles.
+    Raises:
+        CustomException: If http2 is set but httpx or its h2 extra is not installed.
+    """
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
+    wait_for_turn = rate_limiter(MAX_REQUESTS_PER_SECOND)
+
+    if http2:
+        try:
+            if httpx is None:
+                raise ImportError("No module named 'httpx'")
+            # Raises ImportError when httpx is installed without the h2 package
+            session = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,  # Match aiohttp, redirected titles are common
+                limits=httpx.Limits(max_connections=16),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+            )
+        except ImportError as e:
+            raise CustomException(f"httpx[http2] is required to crawl over HTTP/2: {str(e)}") from e
+    else:
+        # Every article is on the same host, resolve it once for the whole crawl
+        connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=DNS_CACHE_TTL)
+        timeout = aiohttp.ClientTimeout(sock_connect=REQUEST_TIMEOUT[0], sock_read=REQUEST_TIMEOUT[1])
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async with session:
+        async def bounded(i, title):
+            async with semaphore:
+                await wait_for_turn()  # Pace requests to avoid overwhelming the server
+                print(f"Scraping article {i + 1}/{total}: {title}")
+                try:
+                    return await scrape_wikipedia_content(session, title)
+                except Exception as e:
+                    logging.error(f"Error scraping article {title}: {e}")
+                    return []
+
+        return await asyncio.gather(*(bounded(i, title) for i, title in titles))
+
+
 # Function to scrape articles and save to JSON
-def scrape_multiple_articles(titles, num_articles, output_file):
+def scrape_multiple_articles(titles, num_articles, output_file, http2=False):
     """
     Scrapes multiple Wikipedia articles based on the provided titles and saves them to a JSON file.
     Each paragraph is saved as a separate entry.
     Args:
         titles (list of str): List of Wikipedia article titles to scrape.
-        num_articles (int): Number of articles to scrape from the titles list.
+        num_articles (int): Number of Sinhala titles to scrape from the titles list.
         output_file (str, optional): Path to the output JSON file where scraped articles will be saved.
+        http2 (bool, optional): Fetch over a single multiplexed HTTP/2 connection (requires httpx[http2]).
     Returns:
         None
     Raises:
         Exception: If there is an error initializing the output file or saving the articles.
     Notes:
-        - The function pauses for 5 seconds between requests to avoid overwhelming the server.
+        - Articles are fetched concurrently, at most CONCURRENT_REQUESTS at a time and at most
+          MAX_REQUESTS_PER_SECOND started per second, to avoid overwhelming the server.
         - If no articles are successfully scraped, a message is printed and no file is saved.
     """
     articles = []
@@ -140,38 +294,25 @@ def scrape_multiple_articles(titles, num_articles, output_file):
 
     # Initialize output file with an empty list
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump([], f, ensure_ascii=False, indent=4)
+        with open(output_file, 'wb') as f:
+            f.write(json_dumps([]))
     except Exception as e:
         logging.error(f"Error initializing output file {output_file}: {e}")
         return
 
-    # Define a regular expression to check for titles that contain non-Sinhala characters
-    sinhala_title_pattern = re.compile(r'^[\u0D80-\u0DFF\s]+$')  # Match only Sinhala characters and spaces
+    # Skip the first title and drop non-Sinhala ones once up front, stopping at num_articles
+    valid_titles = list(islice(filter(is_sinhala_title, islice(titles, 1, None)), num_articles))
 
-    # Iterate over titles, skipping the first one and filtering out invalid titles
-    for i, title in enumerate(titles[1:num_articles+1]):  # titles[1:] skips the first title
-        # Skip titles that don't match the Sinhala characters pattern
-        if not sinhala_title_pattern.match(title):
-            print(f"Skipping invalid title (non-Sinhala characters): {title}")
-            continue
-        
-        print(f"Scraping article {i + 1}/{num_articles}: {title}")
-        try:
-            article_info_list = scrape_wikipedia_content(title)
-            if article_info_list:
-                articles.extend(article_info_list)  # Add all paragraphs as separate entries
-                scraped_count += len(article_info_list)  # Increment the counter for each paragraph
-        except Exception as e:
-            logging.error(f"Error scraping article {title}: {e}")
-        
-        time.sleep(5)  # Pause for 5 seconds between requests
+    for article_info_list in asyncio.run(_scrape_titles(enumerate(valid_titles), len(valid_titles), http2)):
+        if article_info_list:
+            articles.extend(article_info_list)  # Add all paragraphs as separate entries
+            scraped_count += len(article_info_list)  # Increment the counter for each paragraph
 
     # Save articles to JSON if successfully scraped
     if articles:
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(articles, f, ensure_ascii=False, indent=4)
+            with open(output_file, 'wb') as f:
+                f.write(json_dumps(articles))
             print(f"Saved {len(articles)} paragraphs to {output_file}")
             print(f"Total paragraphs scraped: {scraped_count}")  # Display total count
         except Exception as e:
@@ -186,6 +327,7 @@ def main():
     TITLES_FILE = Path(config['TITLES_FILE_PATH'])
     FILE_PATH = Path(config['FILE_PATH_SINHALA_WIKI_DATA'])
     OUTPUT_PATH = Path(config['SCRAPED_WIKI_DATA_PATH'])
+    HTTP2 = config['WIKI_HTTP2']
     
     # Load WIKI titles file and save to JSON
     titles = read_all_titles(FILE_PATH)
@@ -193,14 +335,14 @@ def main():
     print(f"Saved {len(titles)} titles to {TITLES_FILE}.")
     
     #Load titles from JSON
-    with open(TITLES_FILE, 'r', encoding='utf-8') as f:
-        titles = json.load(f)
+    with open(TITLES_FILE, 'rb') as f:
+        titles = json_loads(f.read())
         
     # Define the number of articles to scrape
     num_articles = int(input("Enter the number of articles to scrape: "))
     
     # Scrape articles and save to JSON
-    scrape_multiple_articles(titles, num_articles=num_articles, output_file=OUTPUT_PATH)
+    scrape_multiple_articles(titles, num_articles=num_articles, output_file=OUTPUT_PATH, http2=HTTP2)
 
 if __name__ == "__main__":
     main()
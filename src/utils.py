@@ -1,23 +1,59 @@
 import requests
 import logging
+import json
+import os
 import sys
+import base64
 import uuid
+from contextlib import contextmanager
 import yaml
 import pandas as pd
 from pathlib import Path
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from selectolax.lexbor import LexborHTMLParser
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 from requests.exceptions import RequestException, Timeout, ConnectionError
 from src.exception import CustomException  
 from src.logger import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-def get_parsed_html(url: str) -> BeautifulSoup:
+
+# Bound once, get_unique_id runs for every scraped article
+_b64encode = base64.urlsafe_b64encode
+_uuid4 = uuid.uuid4
+
+_DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
+REQUEST_TIMEOUT = (5, 15)  # (connect, read) seconds
+
+# Shared by every fetch so connections are kept alive across pages. The scrapers
+# talk to a handful of hosts, so few pools with many connections each are kept
+_SESSION = requests.Session()
+_SESSION.headers.update(_DEFAULT_HEADERS)
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=64, pool_block=False, max_retries=Retry(total=3, backoff_factor=0.3))
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+
+def get_parsed_html(url: str, session: requests.Session = None, parse_only: SoupStrainer = None) -> BeautifulSoup:
     """
     Fetches and parses HTML content from a given URL.
 
     Args:
         url (str): The URL to fetch the HTML content from.
+        session (requests.Session, optional): Session to fetch with instead of the shared one.
+        parse_only (SoupStrainer, optional): Only build the tree for the matching tags.
 
     Returns:
         BeautifulSoup: Parsed HTML content.
@@ -27,30 +63,117 @@ def get_parsed_html(url: str) -> BeautifulSoup:
                          a custom exception is raised with details.
     """
     try:
-        #uncomment when running for derena 
-        # headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}  
-        # response = requests.get(url, headers=headers)
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'lxml',from_encoding='utf-8')
+        http = session if session is not None else _SESSION
+        # Let the parser read the body straight off the socket instead of a buffered copy
+        with http.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raw.decode_content = True  # Undo any gzip/deflate transfer encoding
+            soup = BeautifulSoup(response.raw, 'lxml',from_encoding='utf-8', parse_only=parse_only)
         return soup
+    except (Timeout, ConnectionError, RequestException, Urllib3HTTPError) as e:
+        error_message = f"Error fetching {url}: {str(e)}"
+        logging.error(error_message)
+        raise CustomException(error_message, sys) from e  
+
+
+def get_html_tree(url: str, session: requests.Session = None) -> LexborHTMLParser:
+    """
+    Fetches a page and parses it with selectolax, whose C parser and CSS
+    selectors are much cheaper than a BeautifulSoup tree.
+
+    Args:
+        url (str): The URL to fetch the HTML content from.
+        session (requests.Session, optional): Session to fetch with instead of the shared one.
+
+    Returns:
+        LexborHTMLParser: Parsed HTML tree.
+
+    Raises:
+        CustomException: If there's an issue with the network request, 
+                         a custom exception is raised with details.
+    """
+    try:
+        http = session if session is not None else _SESSION
+        response = http.get(url, timeout=REQUEST_TIMEOUT)
+        tree = LexborHTMLParser(response.content)  # The parser decodes the bytes itself
+        # selectolax's text() includes script and style contents, which bs4's text leaves out
+        tree.strip_tags(['script', 'style'])
+        return tree
     except (Timeout, ConnectionError, RequestException) as e:
         error_message = f"Error fetching {url}: {str(e)}"
         logging.error(error_message)
         raise CustomException(error_message, sys) from e  
 
 
+def warm_up_session(*urls):
+    """
+    Opens a pooled connection to the host of each URL ahead of the scrape, so
+    the DNS lookup and TLS handshake are not paid by the first page fetches.
+    Failures are only logged, the scrape itself will report real problems.
+
+    Args:
+        *urls (str): URLs on the hosts to connect to.
+    """
+    for url in urls:
+        try:
+            # HEAD has no body, so the connection goes straight back to the pool
+            _SESSION.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=False)
+        except RequestException as e:
+            logging.warning(f"Could not warm up connection to {url}: {str(e)}")
+
+
+def iter_html_elements(url: str, tag: str, match=None, session: requests.Session = None):
+    """
+    Streams a page through lxml's incremental HTML parser and yields each
+    complete `tag` element accepted by `match`, without building the whole
+    document first. A yielded element is cleared once the caller moves on, so
+    read everything needed from it before advancing.
+
+    Args:
+        url (str): The URL to fetch the HTML content from.
+        tag (str): Tag name of the elements to yield.
+        match (callable, optional): Predicate on an element, all `tag` elements are yielded when None.
+        session (requests.Session, optional): Session to fetch with instead of the shared one.
+
+    Yields:
+        lxml.etree._Element: Each matching element.
+
+    Raises:
+        CustomException: If there's an issue with the network request, 
+                         a custom exception is raised with details.
+    """
+    http = session if session is not None else _SESSION
+    try:
+        with http.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raw.decode_content = True  # Undo any gzip/deflate transfer encoding
+            for _, element in etree.iterparse(response.raw, tag=tag, html=True, encoding='utf-8'):
+                # Only matches are cleared, other elements may be nested inside a later match
+                if match is None or match(element):
+                    yield element
+                    element.clear(keep_tail=True)
+    except (Timeout, ConnectionError, RequestException, Urllib3HTTPError) as e:
+        error_message = f"Error fetching {url}: {str(e)}"
+        logging.error(error_message)
+        raise CustomException(error_message, sys) from e  
+
+
+def close_session():
+    """
+    Closes the pooled connections of the shared session used by get_parsed_html.
+    """
+    _SESSION.close()
+
+
 def get_unique_id()->str:
     '''
-    Generate a unique identifier.
+    Generate a unique identifier from the 16 random bytes of a UUID4, encoded
+    as unpadded URL-safe base64 so it is also safe to use as a file name.
     
     Returns:
-        str: A 24-character unique identifier.
+        str: A 22-character unique identifier.
         
     '''
 
-    id = str(uuid.uuid4()).replace('-', '')[:24]
-
-    return id
+    return _b64encode(_uuid4().bytes)[:22].decode('ascii')
 
 
 
@@ -66,13 +189,14 @@ def load_config(config_path: str) -> dict:
         
     """
     with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlLoader)  # libyaml-backed safe loader when available
     return config
 
 
 def data_loader(path):
     """
-    Loads the data needed to be transformed
+    Loads the data needed to be transformed, from Parquet when the path ends
+    with .parquet and from JSON otherwise
 
     Args:
         path (_type_): Path to input data
@@ -84,7 +208,7 @@ def data_loader(path):
         df: Dataframe
     """
     try:
-        df = pd.read_json(path)
+        df = pd.read_parquet(path) if str(path).endswith('.parquet') else pd.read_json(path)
         logging.info(f'Loaded input data from: {path}')
         
         return df
@@ -92,4 +216,117 @@ def data_loader(path):
     except FileNotFoundError as e:
         error_message = f'Error loading data from {path}: str{e}'
         logging.error(error_message)
-        raise CustomException(error_message)
\ No newline at end of file
+        raise CustomException(error_message)
+
+
+def json_loads(data):
+    """
+    Parses a JSON document, using orjson when it is installed and falling
+    back to the standard library otherwise.
+
+    Args:
+        data (bytes | memoryview | str): The raw JSON document.
+
+    Returns:
+        The parsed JSON object.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def json_dumps(obj, indent: bool = True) -> bytes:
+    """
+    Serializes an object to UTF-8 encoded JSON bytes, using orjson when it is
+    installed and falling back to the standard library otherwise.
+
+    Args:
+        obj: The object to serialize.
+        indent (bool): Pretty-print with a 2-space indent (default is True).
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+
+def advise_sequential(file):
+    """
+    Hints the kernel that an open file will be accessed sequentially, which
+    widens its readahead window. Does nothing where posix_fadvise is missing.
+
+    Args:
+        file: An open file object.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def release_page_cache(file):
+    """
+    Flushes a written file to disk and drops its pages from the page cache, so
+    large outputs don't evict more useful cached data. Call before closing.
+
+    Args:
+        file: A file object open for writing.
+    """
+    file.flush()
+    os.fsync(file.fileno())
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+@contextmanager
+def open_directory(path):
+    """
+    Opens a directory once so files can be created relative to it, without
+    resolving the full path again for every file. Yields None where the
+    platform can't open files relative to a directory descriptor.
+
+    Args:
+        path (Path): The directory to open.
+
+    Yields:
+        int: The directory file descriptor, or None.
+    """
+    if os.open not in os.supports_dir_fd or not hasattr(os, 'O_DIRECTORY'):
+        yield None
+        return
+    dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        yield dir_fd
+    finally:
+        os.close(dir_fd)
+
+
+def write_file_at(directory, file_name: str, data: bytes, dir_fd: int = None):
+    """
+    Writes bytes to a new file in a directory, relative to the directory's
+    descriptor from open_directory when one is given.
+
+    Args:
+        directory (Path): The directory to write into, used when dir_fd is None.
+        file_name (str): Name of the file to create or overwrite.
+        data (bytes): The file content.
+        dir_fd (int, optional): Descriptor of the directory from open_directory.
+    """
+    if dir_fd is None:
+        with open(Path(directory) / file_name, 'wb') as f:
+            f.write(data)
+        return
+
+    fd = os.open(file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)